@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+import time
+from datetime import date, time as clock
+#### 此文件 对比开启/关闭页面片段缓存时首页、会议室列表和会议室详情的响应时间
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/bench_fragments.py
+# 使用临时数据库和模拟数据，不会修改 instance/meeting_rooms.db
+
+db_path = os.path.join(tempfile.mkdtemp(), 'bench_fragments.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Room, Equipment, RoomEquipment, Reservation, Maintenance
+
+ROOMS = 60
+REQUESTS = 300
+URLS = ['/', '/rooms', '/room/1']
+
+
+def seed():
+    today = date.today()
+    equipments = Equipment.query.all()
+    rooms = [Room(name=f'压测会议室{i}', location=f'{i % 20}楼', capacity=10 + i, description='模拟数据')
+             for i in range(ROOMS)]
+    db.session.add_all(rooms)
+    db.session.flush()
+    for room in rooms:
+        for equipment in equipments:
+            db.session.add(RoomEquipment(room_id=room.id, equipment_id=equipment.id, quantity=2))
+        for hour in range(8, 20):
+            db.session.add(Reservation(title=f'会议{room.id}-{hour}', date=today, start_time=clock(hour, 0),
+                                       end_time=clock(hour, 45), attendees=5, user_id=1, room_id=room.id))
+        db.session.add(Maintenance(room_id=room.id, start_date=today, end_date=today, reason='例行维护',
+                                   created_by=1))
+    db.session.commit()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def measure(client, url):
+    client.get(url)
+    timings = []
+    for _ in range(REQUESTS):
+        started = time.perf_counter()
+        client.get(url).get_data()
+        timings.append((time.perf_counter() - started) * 1000)
+    return percentile(timings, 0.5), percentile(timings, 0.95)
+
+
+def main():
+    with app.app_context():
+        seed()
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    results = {}
+    for enabled in (False, True):
+        app.config['FRAGMENT_CACHE_ENABLED'] = enabled
+        for url in URLS:
+            results[url, enabled] = measure(client, url)
+
+    print(f"{ROOMS} 个会议室，每个页面请求 {REQUESTS} 次（毫秒）")
+    print(f"{'页面':<10}{'关闭 p50':>10}{'关闭 p95':>10}{'开启 p50':>10}{'开启 p95':>10}")
+    for url in URLS:
+        off, on = results[url, False], results[url, True]
+        print(f"{url:<12}{off[0]:10.2f}{off[1]:10.2f}{on[0]:10.2f}{on[1]:10.2f}")
+
+    os.remove(db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import date, timedelta
+#### 此文件 对比添加组合索引前后热点查询的执行计划和耗时
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/bench_indexes.py
+# 使用临时数据库和模拟数据，不会修改 instance/meeting_rooms.db
+
+ROOMS = 200
+USERS = 2000
+DAYS = 365
+PER_ROOM_DAY = 4
+
+# 与 main.py 中模型声明的索引保持一致
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_reservation_room_date_status ON reservation (room_id, date, status)",
+    "CREATE INDEX IF NOT EXISTS ix_reservation_user_date ON reservation (user_id, date)",
+    "CREATE INDEX IF NOT EXISTS ix_reservation_date_status ON reservation (date, status)",
+    "CREATE INDEX IF NOT EXISTS ix_maintenance_room_dates ON maintenance (room_id, start_date, end_date)",
+]
+
+today = date.today()
+day = (today + timedelta(days=10)).isoformat()
+
+# 各路由中的热点查询
+QUERIES = [
+    ("冲突检测 (room_id, date, status)",
+     "SELECT id, start_time, end_time FROM reservation WHERE room_id = ? AND date = ? AND status = 'confirmed'",
+     (7, day)),
+    ("我的预订 (user_id, date)",
+     "SELECT * FROM reservation WHERE user_id = ? ORDER BY date DESC, start_time",
+     (42,)),
+    ("今日统计 (date, status)",
+     "SELECT count(*) FROM reservation WHERE date = ? AND status = 'confirmed'",
+     (day,)),
+    ("维护检查 (room_id, start_date, end_date)",
+     "SELECT * FROM maintenance WHERE room_id = ? AND start_date <= ? AND end_date >= ? LIMIT 1",
+     (7, day, day)),
+]
+
+
+def create_schema(conn):
+    conn.executescript("""
+        CREATE TABLE reservation (
+            id INTEGER PRIMARY KEY,
+            title VARCHAR(100) NOT NULL,
+            date DATE NOT NULL,
+            start_time TIME NOT NULL,
+            end_time TIME NOT NULL,
+            attendees INTEGER NOT NULL,
+            description TEXT,
+            status VARCHAR(20),
+            created_at DATETIME,
+            user_id INTEGER NOT NULL,
+            room_id INTEGER NOT NULL
+        );
+        CREATE TABLE maintenance (
+            id INTEGER PRIMARY KEY,
+            room_id INTEGER NOT NULL,
+            start_date DATE NOT NULL,
+            end_date DATE NOT NULL,
+            reason TEXT NOT NULL,
+            created_by INTEGER NOT NULL,
+            created_at DATETIME
+        );
+    """)
+
+
+def fill_data(conn):
+    random.seed(1)
+    rows = []
+    start_day = today - timedelta(days=DAYS // 2)
+    for offset in range(DAYS):
+        d = (start_day + timedelta(days=offset)).isoformat()
+        for room_id in range(1, ROOMS + 1):
+            for slot in range(PER_ROOM_DAY):
+                hour = 8 + slot * 3
+                status = 'canceled' if random.random() < 0.1 else 'confirmed'
+                rows.append((
+                    '测试会议', d, f'{hour:02d}:00:00.000000', f'{hour + 1:02d}:30:00.000000',
+                    5, '', status, random.randint(1, USERS), room_id
+                ))
+    conn.executemany(
+        "INSERT INTO reservation (title, date, start_time, end_time, attendees, description, status, user_id, room_id) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    maintenances = []
+    for room_id in range(1, ROOMS + 1):
+        for _ in range(5):
+            s = start_day + timedelta(days=random.randint(0, DAYS))
+            maintenances.append((room_id, s.isoformat(), (s + timedelta(days=2)).isoformat(), '例行维护', 1))
+    conn.executemany(
+        "INSERT INTO maintenance (room_id, start_date, end_date, reason, created_by) VALUES (?, ?, ?, ?, ?)",
+        maintenances)
+    conn.commit()
+    print(f"模拟数据：预订 {len(rows)} 条，维护 {len(maintenances)} 条")
+
+
+def run_queries(conn, label, repeat=50):
+    print(f"\n==== {label} ====")
+    for name, sql, params in QUERIES:
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            conn.execute(sql, params).fetchall()
+        elapsed = (time.perf_counter() - started) / repeat * 1000
+        print(f"\n{name}: 平均 {elapsed:.3f} ms")
+        for row in plan:
+            print("    ", row[-1])
+
+
+if __name__ == '__main__':
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    conn = sqlite3.connect(path)
+    create_schema(conn)
+    fill_data(conn)
+
+    run_queries(conn, "添加索引前")
+
+    for sql in INDEXES:
+        conn.execute(sql)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+    run_queries(conn, "添加索引后")
+    conn.close()
+    os.remove(path)
@@ -0,0 +1,110 @@
+import io
+import os
+import sys
+import tempfile
+import time as timer
+from datetime import date, datetime, time, timedelta
+#### 此文件 检查签到表内容并对比三种生成方式的耗时：每次用 python-docx 从头构建、模板填充、命中缓存
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/bench_signin_sheet.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'signin.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from docx.shared import Pt, Cm
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.table import WD_ALIGN_VERTICAL
+from main import app, db, Reservation, build_signin_sheet, signin_sheet_template, signin_sheet_cache
+
+REPEAT = 50
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def build_from_scratch(reservation):
+    """原来的做法：每次逐项构建整个文档"""
+    doc = Document()
+    for section in doc.sections:
+        section.top_margin = section.bottom_margin = section.left_margin = section.right_margin = Cm(2)
+    title = doc.add_paragraph()
+    title_run = title.add_run('会议签到表')
+    title_run.font.size = Pt(16)
+    title_run.font.bold = True
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    info = doc.add_paragraph()
+    info.add_run(f'会议名称：{reservation.title}\n').font.bold = True
+    info.add_run(f'会议时间：{reservation.date.strftime("%Y年%m月%d日")} {reservation.format_time()}\n').font.bold = True
+    info.add_run(f'会议地点：{reservation.room.name} ({reservation.room.location})\n').font.bold = True
+    doc.add_paragraph('请与会人员签到：', style='Intense Quote')
+    table = doc.add_table(rows=11, cols=4)
+    table.style = 'Table Grid'
+    for cell, text in zip(table.rows[0].cells, ('序号', '部门', '姓名', '签到')):
+        cell.text = text
+    for i in range(1, 11):
+        cell = table.cell(i, 0)
+        cell.text = str(i)
+        cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
+        cell.vertical_alignment = WD_ALIGN_VERTICAL.CENTER
+    footer = doc.sections[0].footer.paragraphs[0]
+    footer.text = f"本文档由会议室预订系统自动生成 - {datetime.now().strftime('%Y-%m-%d')}"
+    stream = io.BytesIO()
+    doc.save(stream)
+    return stream.getvalue()
+
+
+def measure(label, f):
+    started = timer.perf_counter()
+    for _ in range(REPEAT):
+        f()
+    print(f"{label}: 平均 {(timer.perf_counter() - started) / REPEAT * 1000:.2f} ms")
+
+
+def main():
+    with app.app_context():
+        reservation = Reservation(title='Q3 <复盘> & 计划', date=date.today() + timedelta(days=1), start_time=time(9, 0),
+                                  end_time=time(10, 0), attendees=3, user_id=1, room_id=1,
+                                  attendee_names='张三\n李四\n\n王五 ')
+        db.session.add(reservation)
+        db.session.commit()
+        reservation_id = reservation.id
+
+        filename, data, etag = build_signin_sheet(reservation)
+        doc = Document(io.BytesIO(data))
+        table = doc.tables[0]
+        check('生成的文件可以用 python-docx 打开，默认 10 行', len(table.rows) == 11)
+        check('参会人员依次填入姓名列', [table.cell(i, 2).text for i in range(1, 5)] == ['张三', '李四', '王五', ''])
+        check('序号连续', [table.cell(i, 0).text for i in range(1, 11)] == [str(i) for i in range(1, 11)])
+        check('会议名称中的特殊字符正确转义', 'Q3 <复盘> & 计划' in doc.paragraphs[1].text)
+        check('页脚包含生成日期', date.today().isoformat() in doc.sections[0].footer.paragraphs[0].text)
+        check('指定行数', len(Document(io.BytesIO(build_signin_sheet(reservation, rows=25)[1])).tables[0].rows) == 26)
+        check('参会人员多于行数时按人数', len(Document(io.BytesIO(build_signin_sheet(reservation, rows=2)[1])).tables[0].rows) == 4)
+        check('相同内容命中缓存', build_signin_sheet(reservation)[1] is data)
+        reservation.title = '改名后的会议'
+        db.session.commit()
+        check('修改预订后重新生成', build_signin_sheet(reservation)[2] != etag)
+
+        measure('python-docx 从头构建', lambda: build_from_scratch(reservation))
+        measure('模板填充（不使用缓存）', lambda: signin_sheet_template.render(
+            {'__TITLE__': reservation.title, '__TIME__': '', '__PLACE__': '', '__GENERATED__': ''}, ['张三'], 10))
+        measure('命中缓存', lambda: build_signin_sheet(reservation))
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    response = client.get(f'/reservation/{reservation_id}/signin-sheet')
+    check('下载签到表', response.status_code == 200 and response.data[:2] == b'PK')
+    response = client.get(f'/reservation/{reservation_id}/signin-sheet', headers={'If-None-Match': response.headers['ETag']})
+    check('内容未变时返回 304', response.status_code == 304)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from sqlalchemy import text
+#### 此文件 对比 SQLite 默认设置与 production 配置（WAL、busy_timeout 等）下的并发读写吞吐量
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/bench_sqlite_profile.py
+# 每种配置在独立子进程中使用临时数据库运行，不会修改 instance/meeting_rooms.db
+
+# 接口：通过 Flask 测试客户端读写；数据库：直接通过连接池读写
+READERS = 8
+WRITERS = 4
+DURATION = 5
+ROOMS = 40
+PROFILES = ['default', 'production']
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+day = date.today() + timedelta(days=1)
+
+
+def reader(client, stop, counts, lock):
+    # 多会议室搜索每次都直接查询数据库
+    while not stop.is_set():
+        response = client.get(f'/api/find_rooms?date={day}&start_time=10:00&end_time=11:00&attendees=5')
+        with lock:
+            key = 'read_ok' if response.status_code == 200 else 'read_error'
+            counts[key] += 1
+
+
+def writer(index, client, stop, counts, lock):
+    # 每个写线程使用不同的会议室，只比较数据库写入本身
+    room_id = index + 1
+    n = 0
+    while not stop.is_set():
+        minute = 8 * 60 + (n % 144) * 5
+        response = client.post('/api/quick_reserve', json={
+            'title': '压测', 'room_id': room_id, 'date': (day + timedelta(days=n // 144)).isoformat(),
+            'start_time': f'{minute // 60:02d}:{minute % 60:02d}',
+            'end_time': f'{(minute + 5) // 60:02d}:{(minute + 5) % 60:02d}'
+        })
+        n += 1
+        with lock:
+            key = 'write_ok' if response.status_code == 200 else 'write_error'
+            counts[key] += 1
+
+
+def engine_reader(engine, stop, counts, lock):
+    # 直接通过连接池执行聚合查询，不经过 Flask，主要耗时在 SQLite 内
+    while not stop.is_set():
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT room_id, count(*) FROM reservation GROUP BY room_id")).all()
+            key = 'read_ok'
+        except Exception:
+            key = 'read_error'
+        with lock:
+            counts[key] += 1
+
+
+def engine_writer(index, engine, stop, counts, lock):
+    n = 0
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "INSERT INTO reservation (title, date, start_time, end_time, attendees, status, user_id, room_id) "
+                    "VALUES ('压测', :date, '08:00:00.000000', '08:05:00.000000', 1, 'canceled', 1, :room_id)"
+                ), {'date': (day + timedelta(days=n)).isoformat(), 'room_id': index + 1})
+            key = 'write_ok'
+        except Exception:
+            key = 'write_error'
+        n += 1
+        with lock:
+            counts[key] += 1
+
+
+def measure(label, make_threads):
+    counts = {'read_ok': 0, 'read_error': 0, 'write_ok': 0, 'write_error': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    threads = make_threads(stop, counts, lock)
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    print(f"    {label:<10} 读 {counts['read_ok'] / DURATION:8.1f}/s (失败 {counts['read_error']})  "
+          f"写 {counts['write_ok'] / DURATION:7.1f}/s (失败 {counts['write_error']})")
+
+
+def run_profile():
+    from main import app, db, Room
+
+    with app.app_context():
+        db.session.add_all([Room(name=f'压测会议室{i}', location=f'{i}楼', capacity=20) for i in range(ROOMS)])
+        db.session.commit()
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    print(f"{os.environ['DB_PROFILE']} (journal_mode={journal_mode})")
+
+    clients = []
+    for _ in range(READERS + WRITERS):
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': 'admin'})
+        clients.append(client)
+    measure('接口', lambda stop, counts, lock: (
+        [threading.Thread(target=reader, args=(clients[i], stop, counts, lock)) for i in range(READERS)] +
+        [threading.Thread(target=writer, args=(i, clients[READERS + i], stop, counts, lock)) for i in range(WRITERS)]
+    ))
+
+    with app.app_context():
+        engine = db.engine
+    measure('数据库', lambda stop, counts, lock: (
+        [threading.Thread(target=engine_reader, args=(engine, stop, counts, lock)) for _ in range(READERS)] +
+        [threading.Thread(target=engine_writer, args=(i, engine, stop, counts, lock)) for i in range(WRITERS)]
+    ))
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--run':
+        run_profile()
+        sys.exit(0)
+
+    print(f"{READERS} 个读线程 + {WRITERS} 个写线程，每种配置运行 {DURATION}s")
+    for profile in PROFILES:
+        path = os.path.join(tempfile.mkdtemp(), 'bench_profile.db')
+        env = dict(os.environ, DB_PROFILE=profile, DATABASE_URL='sqlite:///' + path)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--run'], env=env, check=True)
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date, timedelta
+#### 此文件 检查批量预订接口：格式错误的请求返回 400，提交时才发现的冲突只影响对应的时间段
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_batch_reserve.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'batch.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+from main import app
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def book_between_check_and_commit(day, start_time, end_time):
+    """模拟另一个请求在检查之后、提交之前预订了同一时间段"""
+    commit_reservations = main.commit_reservations
+
+    def racing_commit(reservations):
+        main.commit_reservations = commit_reservations
+        connection = sqlite3.connect(db_path)
+        with connection:
+            connection.execute(
+                "INSERT INTO reservation (title, date, start_time, end_time, attendees, description, status, created_at, user_id, room_id) "
+                "VALUES ('抢先预订', ?, ?, ?, 1, '', 'confirmed', CURRENT_TIMESTAMP, 1, 1)",
+                (day.isoformat(), start_time + ':00.000000', end_time + ':00.000000'))
+        connection.close()
+        return commit_reservations(reservations)
+
+    main.commit_reservations = racing_commit
+
+
+def main_check():
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    day = date.today() + timedelta(days=3)
+
+    # 合法 JSON 但结构不对
+    for name, body in [
+        ('请求体是数组', [1, 2]),
+        ('请求体是字符串', 'text'),
+        ('重复规则不是对象', {'title': '批量', 'room_id': 1, 'date': day.isoformat(),
+                              'start_time': '09:00', 'end_time': '10:00', 'recurrence': 'weekly'}),
+        ('时间段列表不是数组', {'title': '批量', 'slots': {'room_id': 1}}),
+        ('时间段不是对象', {'title': '批量', 'slots': ['2030-01-01']}),
+        ('标题不是字符串', {'title': ['批量'], 'slots': [{'room_id': 1, 'date': day.isoformat(),
+                                                          'start_time': '09:00', 'end_time': '10:00'}]}),
+    ]:
+        response = client.post('/api/batch_reserve', json=body)
+        check(f'{name}时返回 400', response.status_code == 400 and 'error' in response.get_json())
+
+    slots = [{'room_id': 1, 'date': day.isoformat(), 'start_time': f'{hour:02d}:00', 'end_time': f'{hour + 1:02d}:00'}
+             for hour in (9, 10, 11)]
+
+    # 非原子批次：提交时冲突的时间段单独失败，其余照常预订
+    book_between_check_and_commit(day, '10:00', '11:00')
+    response = client.post('/api/batch_reserve', json={'title': '批量', 'slots': slots})
+    data = response.get_json()
+    check('提交时冲突后其余时间段仍预订成功', response.status_code == 200 and data['created'] == 2 and data['failed'] == 1)
+    check('冲突记在对应的时间段上',
+          [result['success'] for result in data['results']] == [True, False, True]
+          and data['results'][1]['error'] == '该时间段会议室已被预订'
+          and all('reservation_id' in data['results'][i] for i in (0, 2)))
+
+    # 原子批次：整体不预订，仍返回每个时间段的结果
+    later = day + timedelta(days=1)
+    atomic_slots = [dict(slot, date=later.isoformat()) for slot in slots]
+    book_between_check_and_commit(later, '11:00', '12:00')
+    response = client.post('/api/batch_reserve', json={'title': '原子', 'slots': atomic_slots, 'atomic': True})
+    data = response.get_json()
+    check('原子批次提交时冲突返回 409', response.status_code == 409 and data['created'] == 0)
+    check('原子批次标出冲突的时间段',
+          [result.get('error') for result in data['results']]
+          == ['其他时间段预订失败，本批次未预订'] * 2 + ['该时间段会议室已被预订'])
+    with app.app_context():
+        titles = [reservation.title for reservation in main.Reservation.query.filter_by(date=later)]
+    check('原子批次没有写入任何预订', titles == ['抢先预订'])
+
+
+if __name__ == '__main__':
+    main_check()
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,110 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import date, time, timedelta
+#### 此文件 随机执行预订的新增、取消、修改、删除和批量删除，检查计数表与预订表实时汇总的结果一致
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_counters.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db
+# 结果不一致时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'check_counters.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from main import app, db, User, Role, Reservation, ReservationCounter
+
+OPERATIONS = 400
+
+today = date.today()
+
+
+def actual_counts():
+    rows = db.session.query(
+        Reservation.room_id, Reservation.date, Reservation.status, func.count(Reservation.id)
+    ).group_by(Reservation.room_id, Reservation.date, Reservation.status).all()
+    return {(room_id, day, status): count for room_id, day, status, count in rows}
+
+
+def counter_counts():
+    rows = db.session.query(ReservationCounter).filter(ReservationCounter.count != 0).all()
+    return {(row.room_id, row.date, row.status): row.count for row in rows}
+
+
+def main():
+    random.seed(1)
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    with app.app_context():
+        user_role_id = Role.query.filter_by(name='user').first().id
+        users = []
+        for i in range(5):
+            user = User(username=f'计数用户{i}', email=f'counter{i}@example.com', role_id=user_role_id)
+            user.set_password('user')
+            users.append(user)
+        db.session.add_all(users)
+        db.session.commit()
+        user_ids = [user.id for user in users]
+
+    for _ in range(OPERATIONS):
+        op = random.random()
+        day = today + timedelta(days=random.randint(1, 10))
+        hour = random.randint(8, 18)
+        with app.app_context():
+            if op < 0.4:
+                # 通过接口预订，冲突时被拒绝并回滚
+                client.post('/api/quick_reserve', json={
+                    'room_id': random.randint(1, 2), 'date': day.isoformat(), 'title': '计数测试',
+                    'start_time': f'{hour:02d}:00', 'end_time': f'{hour:02d}:30'
+                })
+            elif op < 0.55:
+                db.session.add(Reservation(title='计数测试', date=day, start_time=time(hour, 0), end_time=time(hour, 30),
+                                           attendees=1, user_id=random.choice(user_ids), room_id=random.randint(1, 2)))
+                db.session.commit()
+            elif op < 0.7:
+                reservation = Reservation.query.filter_by(status='confirmed').order_by(func.random()).first()
+                if reservation:
+                    client.post(f'/admin/reservation/{reservation.id}/cancel')
+            elif op < 0.8:
+                # 修改日期和会议室
+                reservation = Reservation.query.order_by(func.random()).first()
+                if reservation:
+                    reservation.date = day
+                    reservation.room_id = random.randint(1, 2)
+                    db.session.commit()
+            elif op < 0.9:
+                reservation = Reservation.query.order_by(func.random()).first()
+                if reservation:
+                    db.session.delete(reservation)
+                    db.session.commit()
+            elif op < 0.95:
+                # 修改后回滚，计数不应变化
+                reservation = Reservation.query.order_by(func.random()).first()
+                if reservation:
+                    reservation.status = 'completed'
+                    db.session.flush()
+                    db.session.rollback()
+            else:
+                # 批量删除某个用户的全部预订
+                Reservation.query.filter_by(user_id=random.choice(user_ids)).delete()
+                db.session.commit()
+
+    with app.app_context():
+        actual = actual_counts()
+        counters = counter_counts()
+    ok = actual == counters
+    print(f"{'OK  ' if ok else 'FAIL'} {OPERATIONS} 次操作后计数表 {sum(counters.values())} 条，预订表 {sum(actual.values())} 条")
+    if not ok:
+        for key in sorted(set(actual) | set(counters)):
+            if actual.get(key) != counters.get(key):
+                print('    ', key, '预订表', actual.get(key), '计数表', counters.get(key))
+
+    os.remove(db_path)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
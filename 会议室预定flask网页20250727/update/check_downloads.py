@@ -0,0 +1,101 @@
+import hashlib
+import os
+import sys
+import tempfile
+from datetime import date, time, timedelta
+from io import BytesIO
+#### 此文件 检查会议文档下载：Range 断点续传、以校验和为 ETag 的 304、X-Sendfile / X-Accel-Redirect 交给前端服务器发送
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_downloads.py
+# 使用临时数据库和临时上传目录，不会修改 instance/meeting_rooms.db 和 uploads；任一检查失败时以非零状态退出
+
+tmp_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tmp_dir, 'downloads.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Reservation, ReservationDocument, User, Role, document_store
+
+upload_folder = os.path.join(tmp_dir, 'uploads')
+os.makedirs(os.path.join(upload_folder, 'tmp'))
+app.config['UPLOAD_FOLDER'] = upload_folder
+document_store.folder = upload_folder
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def main():
+    with app.app_context():
+        reservation = Reservation(title='会议', date=date.today() + timedelta(days=1), start_time=time(9, 0),
+                                  end_time=time(10, 0), attendees=1, user_id=1, room_id=1)
+        other = User(username='other', email='other@example.com', role_id=Role.query.filter_by(name='user').first().id)
+        other.set_password('other')
+        db.session.add_all([reservation, other])
+        db.session.commit()
+        reservation_id = reservation.id
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    content = os.urandom(256 * 1024)
+    checksum = hashlib.sha256(content).hexdigest()
+    client.post(f'/reservation/{reservation_id}/upload',
+                data={'document': (BytesIO(content), 'plan.pdf')}, content_type='multipart/form-data')
+    with app.app_context():
+        document = ReservationDocument.query.one()
+        url = f'/document/{document.id}/download'
+        stored_filename = document.stored_filename
+
+    # 由应用发送
+    response = client.get(url)
+    check('完整下载', response.status_code == 200 and response.data == content)
+    check('ETag 为内容校验和', response.headers.get('ETag') == f'"{checksum}"')
+    response = client.get(url, headers={'If-None-Match': f'"{checksum}"'})
+    check('重复下载返回 304 且没有内容', response.status_code == 304 and response.data == b'')
+    response = client.get(url, headers={'Range': 'bytes=1000-1999'})
+    check('断点续传返回 206 和指定范围', response.status_code == 206 and response.data == content[1000:2000]
+          and response.headers.get('Content-Range') == f'bytes 1000-1999/{len(content)}')
+    response = client.get(url, headers={'Range': 'bytes=1000-', 'If-Range': f'"{checksum}"'})
+    check('If-Range 匹配时从断点继续', response.status_code == 206 and response.data == content[1000:])
+
+    # X-Sendfile
+    app.config['DOCUMENT_OFFLOAD'] = 'sendfile'
+    response = client.get(url)
+    check('sendfile：返回 X-Sendfile 头且没有内容',
+          response.headers.get('X-Sendfile') == os.path.join(upload_folder, stored_filename) and response.data == b'')
+    check('sendfile：保留下载文件名', 'filename=plan.pdf' in response.headers.get('Content-Disposition', ''))
+
+    # X-Accel-Redirect
+    app.config['DOCUMENT_OFFLOAD'] = 'accel'
+    response = client.get(url)
+    check('accel：返回 X-Accel-Redirect 头且没有内容',
+          response.headers.get('X-Accel-Redirect') == '/protected-uploads/' + stored_filename
+          and 'X-Sendfile' not in response.headers and response.data == b'')
+    check('accel：保留文件类型', response.mimetype == 'application/pdf')
+
+    # 文件丢失时各种发送方式都返回 404
+    file_path = os.path.join(upload_folder, stored_filename)
+    os.rename(file_path, file_path + '.bak')
+    for offload in ('', 'sendfile', 'accel'):
+        app.config['DOCUMENT_OFFLOAD'] = offload
+        response = client.get(url)
+        check(f"{offload or '由应用发送'}：文件丢失时返回 404",
+              response.status_code == 404 and 'X-Sendfile' not in response.headers and 'X-Accel-Redirect' not in response.headers)
+    os.rename(file_path + '.bak', file_path)
+    app.config['DOCUMENT_OFFLOAD'] = 'accel'
+
+    # 没有权限时不交给前端服务器
+    other_client = app.test_client()
+    other_client.post('/login', data={'username': 'other', 'password': 'other'})
+    response = other_client.get(url)
+    check('无权限用户被重定向，没有 X-Accel-Redirect', response.status_code == 302 and 'X-Accel-Redirect' not in response.headers)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from datetime import date, timedelta
+#### 此文件 检查 /api/events 推送的增量变更：写入预订和维护计划后订阅者能收到对应事件
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_events.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'events.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Reservation, change_feed
+
+# 连接很快到期，读取线程随之结束
+app.config['EVENT_STREAM_KEEPALIVE'] = 1
+app.config['EVENT_STREAM_MAX_AGE'] = 3
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def parse(chunks):
+    """把 SSE 文本解析为 (id, event, data) 列表，忽略注释和 retry"""
+    events = []
+    for block in ''.join(chunks).split('\n\n'):
+        fields = {}
+        for line in block.split('\n'):
+            if line and not line.startswith(':') and ': ' in line:
+                name, value = line.split(': ', 1)
+                fields[name] = value
+        if 'event' in fields:
+            events.append((int(fields['id']), fields['event'], json.loads(fields['data'])))
+    return events
+
+
+def subscribe(client, **kwargs):
+    """发起请求（此时确定起始编号），在线程中读取直到连接到期"""
+    response = client.get('/api/events', buffered=False, **kwargs)
+    chunks = []
+    thread = threading.Thread(target=lambda: chunks.extend(
+        chunk.decode('utf-8') for chunk in response.response))
+    thread.start()
+    return response, chunks, thread
+
+
+def main():
+    admin = app.test_client()
+    admin.post('/login', data={'username': 'admin', 'password': 'admin'})
+    anonymous = app.test_client()
+
+    response, admin_chunks, admin_thread = subscribe(admin)
+    check('响应类型为 text/event-stream', response.mimetype == 'text/event-stream')
+    _, public_chunks, public_thread = subscribe(anonymous)
+    start_id = change_feed.last_id
+
+    day = (date.today() + timedelta(days=3)).isoformat()
+    reservation_id = admin.post('/api/quick_reserve', json={
+        'room_id': 1, 'date': day, 'start_time': '09:00', 'end_time': '10:00', 'title': '推送测试'
+    }).get_json()['reservation_id']
+    admin.post(f'/reservation/{reservation_id}/cancel')
+    admin.post('/admin/maintenance/new', data={'room_id': '2', 'start_date': day, 'end_date': day, 'reason': '检修'})
+    with app.app_context():
+        Reservation.query.filter(Reservation.status == 'canceled').delete()
+        db.session.commit()
+
+    admin_thread.join(10)
+    public_thread.join(10)
+    received = parse(admin_chunks)
+    kinds = [(event, data.get('op')) for _, event, data in received]
+    check('依次收到 新建、取消、维护、批量重置 事件',
+          kinds == [('reservation', 'created'), ('reservation', 'updated'), ('maintenance', 'created'), ('reset', None)])
+    created = received[0][2] if received else {}
+    check('预订事件只包含变更的一条预订',
+          created.get('id') == reservation_id and created.get('date') == day and created.get('start_time') == '09:00')
+    check('管理员收到预订人', created.get('username') == 'admin')
+    check('取消后状态为 canceled', len(received) > 1 and received[1][2]['status'] == 'canceled')
+    check('事件编号连续递增', [event_id for event_id, _, _ in received] == list(range(start_id + 1, start_id + 5)))
+
+    public = parse(public_chunks)
+    check('匿名用户收到相同的事件', [event for _, event, _ in public] == [event for _, event, _ in received])
+    check('匿名用户收不到预订人', all('username' not in data and 'user_id' not in data for _, _, data in public))
+
+    # 断线重连：按 Last-Event-ID 补发之后的事件
+    _, chunks, thread = subscribe(admin, headers={'Last-Event-ID': str(start_id + 2)})
+    thread.join(10)
+    check('重连后补发错过的事件', [event_id for event_id, _, _ in parse(chunks)] == [start_id + 3, start_id + 4])
+
+    # 编号超出当前范围（服务已重启）时要求重新加载
+    _, chunks, thread = subscribe(admin, headers={'Last-Event-ID': str(start_id + 1000)})
+    thread.join(10)
+    check('未知的编号收到 reset', [event for _, event, _ in parse(chunks)][:1] == ['reset'])
+
+    # 部署在子路径下时，日历页的订阅地址和推送事件的详情链接都带上前缀
+    page = anonymous.get('/calendar', base_url='http://localhost/meet/').get_data(as_text=True)
+    check('日历页的链接由 url_for 生成', "EventSource('/meet/api/events" in page
+          and "reservationUrlBase = '/meet/reservation/0'" in page and '`/reservation/' not in page)
+
+    os.remove(db_path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
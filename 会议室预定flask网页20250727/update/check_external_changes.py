@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date, time, timedelta
+#### 此文件 检查其他进程写入数据库后本进程的缓存不会一直过期：用独立的 sqlite3 连接模拟另一个进程修改预订
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_external_changes.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'external.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from main import app, db, reservation_index, occupancy_bitmap, on_data_change, data_change_listeners, DataChange, Reservation
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def external(sql, *params):
+    """另一个进程的写入：不经过本进程的会话，也不会触发任何变更通知"""
+    connection = sqlite3.connect(db_path)
+    with connection:
+        connection.execute(sql, params)
+    connection.close()
+
+
+def version(kind):
+    connection = sqlite3.connect(db_path)
+    value = connection.execute('SELECT version FROM data_version WHERE kind = ?', (kind,)).fetchone()[0]
+    connection.close()
+    return value
+
+
+def availability(client, day):
+    return [slot['start'] for slot in client.get(f'/api/room_availability?room_id=1&date={day}').get_json()['reservations']]
+
+
+def main():
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    day = date.today() + timedelta(days=2)
+    booking = {'room_id': 1, 'date': day.isoformat(), 'start_time': '10:00', 'end_time': '11:00', 'title': '外部取消'}
+
+    response = client.post('/api/quick_reserve', json=booking)
+    reservation_id = response.get_json().get('reservation_id')
+    check('预订成功', response.status_code == 200 and reservation_id)
+    check('同一时段再次预订被拒绝', client.post('/api/quick_reserve', json=booking).status_code in (400, 409))
+
+    # 预订冲突以数据库为准
+    external("UPDATE reservation SET status = 'canceled' WHERE id = ?", reservation_id)
+    response = client.post('/api/quick_reserve', json=booking)
+    check('其他进程取消后可以立即重新预订', response.status_code == 200)
+
+    # 占用位图与冲突检测共用同一份缓存
+    slots = client.get(f'/api/room_availability?room_id=1&date={day}').get_json()['reservations']
+    check('可用时段包含重新预订的会议', [slot['start'] for slot in slots] == ['10:00'])
+    with app.app_context():
+        check('占用位图取自预订区间索引', occupancy_bitmap.day(1, day) is reservation_index.day(1, day))
+
+        # 索引命中后的核对使用调用方会话已取得的连接，不再从连接池另取
+        db.session.connection()
+        checkouts = []
+        def count_checkout(*args):
+            checkouts.append(args)
+        event.listen(db.engine, 'checkout', count_checkout)
+        conflict = reservation_index.has_conflict(1, day, time(10, 30), time(11, 30))
+        event.remove(db.engine, 'checkout', count_checkout)
+        check('索引命中时在调用方的连接上核对', conflict and checkouts == [])
+
+    # 其他进程提交后递增版本号，本进程按 CACHE_SYNC_INTERVAL 检查后相关缓存失效
+    app.config['CACHE_SYNC_INTERVAL'] = 0
+    resets = []
+    on_data_change(lambda changes: resets.extend(change.kind for change in changes if change.id is None))
+    second = client.post('/api/quick_reserve', json=dict(booking, start_time='14:00', end_time='15:00')).get_json()
+    client.get('/rooms')
+    check('本进程的提交不会被当作其他进程的变更', resets == [])
+
+    # 版本号与数据变更在同一事务中递增，回滚时一起撤销
+    before = version('reservation')
+    third = client.post('/api/quick_reserve', json=dict(booking, room_id=2, start_time='16:00', end_time='17:00')).get_json()
+    check('提交预订的事务同时递增版本号', version('reservation') == before + 1)
+    with app.app_context():
+        db.session.add(Reservation(title='回滚', date=day, start_time=time(18, 0), end_time=time(19, 0),
+                                   attendees=1, user_id=1, room_id=2))
+        db.session.flush()
+        db.session.rollback()
+    check('回滚的变更不递增版本号', version('reservation') == before + 1)
+
+    # 监听函数出错时缓存可能过期，下次检查全部重新加载
+    def failing(changes):
+        raise RuntimeError('监听函数出错')
+    on_data_change(failing)
+    client.post(f"/reservation/{third['reservation_id']}/cancel")
+    data_change_listeners.remove(failing)
+    client.get('/rooms')
+    check('监听函数出错后下次检查全部重新加载', {'reservation', 'room', 'user'} <= set(resets))
+    resets.clear()
+
+    calendar_url = f'/calendar_data?start={day}&end={day + timedelta(days=1)}'
+    etag = client.get(calendar_url).headers['ETag']
+    check('可用时段包含两场会议', availability(client, day) == ['10:00', '14:00'])
+    external("UPDATE reservation SET status = 'canceled' WHERE id = ?", second['reservation_id'])
+    external("UPDATE data_version SET version = version + 1 WHERE kind = 'reservation'")
+    check('其他进程取消后可用时段随之更新', availability(client, day) == ['10:00'])
+    response = client.get(calendar_url, headers={'If-None-Match': etag.strip('"')})
+    check('其他进程取消后日历返回新内容和新的 ETag',
+          response.status_code == 200 and response.headers['ETag'] != etag and '14:00' not in response.get_data(as_text=True))
+
+    # 直接修改数据库不会递增版本号，最多 CACHE_MAX_AGE 秒后重新加载
+    external("UPDATE reservation SET status = 'canceled' WHERE room_id = 1 AND date = ?", day.isoformat())
+    check('直接修改数据库后到期前仍使用缓存', availability(client, day) == ['10:00'])
+    app.config['CACHE_MAX_AGE'] = 0
+    check('到期后全部重新加载', availability(client, day) == [])
+    app.config['CACHE_SYNC_INTERVAL'] = 2
+    app.config['CACHE_MAX_AGE'] = 300
+
+    # 加载期间提交的变更不会被旧结果覆盖
+    with app.app_context():
+        load = reservation_index._load
+
+        def racing_load(room_id, load_day):
+            bucket = load(room_id, load_day)
+            reservation_index.apply([DataChange('reservation', -1, None, {
+                'room_id': room_id, 'date': load_day, 'start_time': time(15, 0), 'end_time': time(16, 0),
+                'status': 'confirmed', 'title': '加载期间提交', 'user_id': 1})])
+            return bucket
+
+        reservation_index._load = racing_load
+        reservation_index.day(2, day)
+        reservation_index._load = load
+        check('加载期间有变更时不缓存旧结果', (2, day) not in reservation_index._buckets)
+
+        # 只保留最近使用的分组
+        max_entries = reservation_index._max_entries
+        for offset in range(max_entries + 10):
+            reservation_index.has_conflict(1, day + timedelta(days=offset), time(8, 0), time(9, 0))
+        check(f'缓存的分组数不超过 {max_entries}', len(reservation_index._buckets) <= max_entries)
+
+    os.remove(db_path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import io
+import os
+import sys
+import tempfile
+import time as clock
+import zipfile
+from datetime import date, datetime, time, timedelta
+#### 此文件 检查后台任务：提交、轮询状态、下载结果与同步接口一致，失败、重启恢复和过期清理
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_jobs.py
+# 使用临时数据库和临时结果目录，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+workdir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'jobs.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Job, Reservation, Role, User, job_queue, job_result_path
+
+app.config['JOB_RESULT_FOLDER'] = os.path.join(workdir, 'jobs')
+os.makedirs(app.config['JOB_RESULT_FOLDER'])
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def seed():
+    first_day = date.today() + timedelta(days=1)
+    for offset in range(3):
+        for i in range(4):
+            db.session.add(Reservation(
+                title=f'例会{offset}-{i}', date=first_day + timedelta(days=offset),
+                start_time=time(9 + i, 0), end_time=time(10 + i, 0), attendees=2, user_id=1,
+                room_id=1 + i % 2, status='canceled' if i == 3 else 'confirmed'
+            ))
+    user = User(username='user', email='user@example.com', role_id=Role.query.filter_by(name='user').first().id)
+    user.set_password('user')
+    db.session.add(user)
+    db.session.commit()
+    return first_day
+
+
+def wait(client, job_id, timeout=30):
+    """轮询状态接口直到任务结束"""
+    deadline = clock.monotonic() + timeout
+    while clock.monotonic() < deadline:
+        job = client.get(f'/admin/jobs/{job_id}').get_json()
+        if job['status'] in ('done', 'failed'):
+            return job
+        clock.sleep(0.05)
+    return job
+
+
+def submit(client, **params):
+    response = client.post('/admin/jobs', json=params)
+    return response.status_code, response.get_json()
+
+
+def main():
+    with app.app_context():
+        first_day = seed()
+    year_start = date(first_day.year, 1, 1).isoformat()
+    year_end = date(first_day.year + 1, 12, 31).isoformat()
+
+    admin = app.test_client()
+    admin.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    # 报表：全年的会议室使用情况
+    status, job = submit(admin, kind='report', type='room_usage', date_from=year_start, date_to=year_end)
+    check('提交后返回 202 和排队状态', status == 202 and job['status'] in ('queued', 'running', 'done'))
+    job = wait(admin, job['id'])
+    check('报表任务完成', job['status'] == 'done' and job['download_url'])
+    response = admin.get(job['download_url'])
+    lines = response.get_data(as_text=True).splitlines()
+    check('报表CSV包含表头和两个会议室', response.mimetype == 'text/csv' and lines[0] == '会议室,预订次数,使用时长(小时)'
+          and sorted(line.split(',')[1] for line in lines[1:]) == ['3', '6'])
+
+    # 预订导出与同步接口内容相同
+    filters = {'status': 'confirmed', 'date_from': first_day.isoformat()}
+    expected = admin.get('/api/export_reservations', query_string=filters).get_data()
+    _, job = submit(admin, kind='export_reservations', **filters)
+    job = wait(admin, job['id'])
+    check('预订导出与 /api/export_reservations 一致',
+          job['status'] == 'done' and admin.get(job['download_url']).get_data() == expected)
+
+    # 签到表压缩包与同步接口的文件列表相同
+    filters = {'date_from': first_day.isoformat(), 'date_to': (first_day + timedelta(days=2)).isoformat()}
+    expected = zipfile.ZipFile(io.BytesIO(admin.get('/admin/signin-sheets', query_string=filters).get_data())).namelist()
+    _, job = submit(admin, kind='signin_sheets', **filters)
+    job = wait(admin, job['id'])
+    names = zipfile.ZipFile(io.BytesIO(admin.get(job['download_url']).get_data())).namelist() \
+        if job['status'] == 'done' else []
+    check(f'签到表压缩包包含 {len(names)} 份，与 /admin/signin-sheets 一致', len(names) == 9 and names == expected)
+
+    # 参数错误在提交时拒绝，执行出错记录在任务中
+    check('未知任务类型返回 400', submit(admin, kind='unknown')[0] == 400)
+    check('日期格式无效返回 400', submit(admin, kind='report', date_from='2024/01/01')[0] == 400)
+    _, job = submit(admin, kind='report', type='unknown')
+    job = wait(admin, job['id'])
+    check('执行出错的任务标记为失败并记录原因', job['status'] == 'failed' and job['error'] == '未知的报表类型')
+    check('失败的任务没有遗留结果文件', not os.listdir(app.config['JOB_RESULT_FOLDER'])
+          or all(not name.endswith('.part') for name in os.listdir(app.config['JOB_RESULT_FOLDER'])))
+    check('未完成的任务不能下载', admin.get(f"/admin/jobs/{job['id']}/download").status_code == 302)
+
+    # 表单提交回到任务列表
+    response = admin.post('/admin/jobs', data={'kind': 'export_reservations', 'status': 'all', 'room_id': 'all'})
+    check('表单提交后回到任务列表', response.status_code == 302 and response.location.endswith('/admin/jobs'))
+    text = admin.get('/admin/jobs').get_data(as_text=True)
+    check('任务列表显示各类任务', '统计报表' in text and '签到表压缩包' in text)
+
+    user = app.test_client()
+    user.post('/login', data={'username': 'user', 'password': 'user'})
+    check('普通用户不能提交任务', user.post('/admin/jobs', json={'kind': 'report'}).status_code == 302)
+
+    # 模拟进程重启：排队中的任务继续执行，超时的执行中任务标记为失败
+    with app.app_context():
+        stale = Job(kind='report', params='{}', status='running', created_by=1,
+                    started_at=datetime.utcnow() - timedelta(seconds=app.config['JOB_TIMEOUT'] + 1))
+        queued = Job(kind='report', params='{"type": "user_activity"}', created_by=1)
+        db.session.add_all([stale, queued])
+        db.session.commit()
+        stale_id, queued_id = stale.id, queued.id
+        job_queue.resume()
+    check('重启后排队中的任务继续执行', wait(admin, queued_id)['status'] == 'done')
+    check('重启后超时的执行中任务标记为失败', admin.get(f'/admin/jobs/{stale_id}').get_json()['status'] == 'failed')
+
+    # 已完成的任务不会被再次执行
+    with app.app_context():
+        finished_at = db.session.get(Job, queued_id).finished_at
+        job_queue._run(queued_id)
+        check('已认领的任务不会重复执行', db.session.get(Job, queued_id).finished_at == finished_at)
+
+        # 超过保留期的任务及结果文件被删除
+        db.session.get(Job, queued_id).finished_at = datetime.utcnow() - timedelta(days=app.config['JOB_RETENTION_DAYS'] + 1)
+        db.session.commit()
+        job_queue.purge()
+        check('过期任务及结果文件被删除',
+              db.session.get(Job, queued_id) is None and not os.path.exists(job_result_path(queued_id)))
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+#### 此文件 检查键集分页：逐页向后、向前翻完与一次查询全部结果的顺序一致，筛选条件保留
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_pagination.py
+# 使用临时数据库和模拟数据，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'pagination.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Reservation, Maintenance, User, RESERVATION_ORDER, keyset_paginate
+
+PER_PAGE = 7
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def seed():
+    random.seed(3)
+    today = date.today()
+    # 大量相同日期和开始时间，检验以 id 区分并列行
+    for i in range(300):
+        day = today + timedelta(days=random.randint(-5, 5))
+        start = random.choice((8, 9, 14))
+        db.session.add(Reservation(
+            title=f'会议{i}', date=day, start_time=time(start, 0), end_time=time(start + 1, 0),
+            attendees=1, user_id=1, room_id=random.randint(1, 3),
+            status=random.choice(('confirmed', 'confirmed', 'canceled'))
+        ))
+    for i in range(20):
+        db.session.add(Maintenance(room_id=1, start_date=today + timedelta(days=i % 3),
+                                   end_date=today + timedelta(days=5), reason='检修', created_by=1))
+    db.session.commit()
+
+
+def walk(query, order_by):
+    """向后翻到最后一页，再从最后一页向前翻回第一页"""
+    forward, pages, cursor = [], [], None
+    while True:
+        page = keyset_paginate(query, order_by, after=cursor, per_page=PER_PAGE)
+        pages.append(page)
+        forward.extend(item.id for item in page.items)
+        if not page.next_cursor:
+            break
+        cursor = page.next_cursor
+    backward, cursor = [], pages[-1].prev_cursor
+    while cursor:
+        page = keyset_paginate(query, order_by, before=cursor, per_page=PER_PAGE)
+        backward = [item.id for item in page.items] + backward
+        cursor = page.prev_cursor
+    backward.extend(item.id for item in pages[-1].items)
+    return forward, backward, pages
+
+
+def check_listing(name, query, order_by):
+    expected = [item.id for item in query.order_by(
+        *[column.desc() if descending else column for column, descending in order_by]).all()]
+    forward, backward, pages = walk(query, order_by)
+    check(f'{name}：向后翻页共 {len(pages)} 页，与全部结果一致', forward == expected)
+    check(f'{name}：向前翻页与全部结果一致', backward == expected)
+    check(f'{name}：第一页没有上一页', pages[0].prev_cursor is None)
+
+
+def main():
+    with app.app_context():
+        seed()
+        with app.test_request_context():
+            check_listing('全部预订', Reservation.query, RESERVATION_ORDER)
+            check_listing('筛选后的预订', Reservation.query.filter(
+                Reservation.room_id == 2, Reservation.status == 'confirmed'), RESERVATION_ORDER)
+            check_listing('维护计划', Maintenance.query, [(Maintenance.start_date, True), (Maintenance.id, True)])
+            check_listing('用户', User.query, [(User.id, False)])
+            page = keyset_paginate(Reservation.query, RESERVATION_ORDER, after='无效游标', per_page=PER_PAGE)
+            check('无效游标从第一页开始', page.prev_cursor is None and len(page.items) == PER_PAGE)
+
+        reservations = Reservation.query.filter_by(user_id=1).all()
+        expected = {
+            'upcoming': sum(1 for r in reservations if r.status != 'canceled' and not r.is_past()),
+            'past': sum(1 for r in reservations if r.status != 'canceled' and r.is_past()),
+            'canceled': sum(1 for r in reservations if r.status == 'canceled'),
+        }
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    text = client.get('/my_reservations').get_data(as_text=True)
+    counts = dict(zip(('upcoming', 'past', 'canceled'), map(int, re.findall(r'<span class="badge bg-\w+">(\d+)</span>', text))))
+    check('我的预订在SQL中的分类与 is_past() 一致', counts == expected)
+
+    # 筛选参数在翻页链接中保留
+    app.config['PAGE_SIZE'] = PER_PAGE
+    text = client.get('/admin/reservations?status=canceled&room_id=1').get_data(as_text=True)
+    links = re.findall(r'href="(/admin/reservations\?[^"]*after=[^"]*)"', text)
+    check('翻页链接保留筛选条件', bool(links) and 'status=canceled' in links[0] and 'room_id=1' in links[0])
+    if links:
+        text = client.get(links[0].replace('&amp;', '&')).get_data(as_text=True)
+        check('第二页只包含符合条件的预订', '已确认</span>' not in text and '已取消</span>' in text)
+    text = client.get('/my_reservations?tab=past').get_data(as_text=True)
+    check('历史预订标签页可以翻页', any('tab=past' in link for link in re.findall(r'href="(/my_reservations\?[^"]*after=[^"]*)"', text)))
+
+    os.remove(db_path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
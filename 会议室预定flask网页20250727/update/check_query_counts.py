@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+from datetime import date, time, timedelta
+#### 此文件 检查各页面/接口执行的SQL语句数量，防止出现逐行懒加载（N+1查询）
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_query_counts.py
+# 使用临时数据库和模拟数据，不会修改 instance/meeting_rooms.db
+# 任一路由超过上限时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'query_counts.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from main import app, db, User, Role, Room, Equipment, RoomEquipment, Reservation, Maintenance, ReservationDocument
+
+ROOMS = 20
+USERS = 30
+
+today = date.today()
+tomorrow = today + timedelta(days=1)
+calendar_day = date(today.year, 1, 15)
+
+# 各路由允许的最大SQL语句数，与数据量无关
+# 登录用户及其角色、会议室等基础数据只在第一个请求中加载，之后命中缓存
+MAX_QUERIES = {
+    '/': 4,
+    '/rooms': 0,
+    '/room/1': 2,
+    # 各标签页的数量一条、当前标签页的一页预订一条
+    '/my_reservations': 2,
+    '/reservation/1': 3,
+    f'/calendar_data?start={today.year}-01-01&end={today.year}-02-01': 2,
+    '/admin': 4,
+    '/admin/users': 1,
+    '/admin/rooms': 2,
+    '/admin/maintenance': 1,
+    '/admin/reservations': 1,
+    '/admin/reports': 1,
+    '/admin/reports?type=user_activity': 1,
+    '/api/export_reservations': 1,
+    '/api/rooms': 0,
+    # 首次访问需填充占用位图：会议室、维护计划、当天预订、预订人用户名各一条，之后只剩会议室查询
+    f'/api/room_availability?room_id=1&date={tomorrow}': 4,
+    f'/api/find_rooms?date={tomorrow}&start_time=10:00&end_time=11:00&attendees=10&equipment=1,2': 2,
+    '/api/recent_reservations': 1,
+}
+
+
+def seed():
+    admin = User.query.filter_by(username='admin').first()
+    user_role = Role.query.filter_by(name='user').first()
+    users = [admin]
+    for i in range(USERS):
+        user = User(username=f'user{i}', email=f'user{i}@example.com', department='测试部', role_id=user_role.id)
+        user.set_password('user')
+        users.append(user)
+    db.session.add_all(users)
+
+    equipments = Equipment.query.all()
+    rooms = [Room(name=f'测试会议室{i}', location=f'{i}楼', capacity=20) for i in range(ROOMS)]
+    db.session.add_all(rooms)
+    db.session.flush()
+    for room in rooms:
+        for equipment in equipments[:3]:
+            db.session.add(RoomEquipment(room_id=room.id, equipment_id=equipment.id))
+        db.session.add(Maintenance(room_id=room.id, start_date=today + timedelta(days=30),
+                                   end_date=today + timedelta(days=31), reason='例行维护', created_by=admin.id))
+
+    for i, room in enumerate(Room.query.all()):
+        for day in (today, tomorrow, calendar_day):
+            for hour in (9, 11, 14, 16):
+                db.session.add(Reservation(
+                    title=f'会议{room.id}-{hour}', date=day, start_time=time(hour, 0), end_time=time(hour + 1, 0),
+                    attendees=5, user_id=users[(i + hour) % len(users)].id, room_id=room.id
+                ))
+    db.session.flush()
+    # 第一条预订归管理员所有并附带多份文档
+    db.session.get(Reservation, 1).user_id = admin.id
+    for i in range(5):
+        db.session.add(ReservationDocument(filename=f'资料{i}.pdf', stored_filename=f'{i}.pdf', file_type='pdf',
+                                           file_size=1, reservation_id=1, uploaded_by=users[i].id))
+    db.session.commit()
+
+
+def main():
+    with app.app_context():
+        seed()
+
+    statements = []
+    with app.app_context():
+        # 检查其他进程变更的版本查询每隔 CACHE_SYNC_INTERVAL 秒最多一条，与路由无关，不计入
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: 'data_version' in statement or statements.append(statement))
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    failed = False
+    for url, limit in MAX_QUERIES.items():
+        statements.clear()
+        response = client.get(url)
+        response.get_data()
+        count = len(statements)
+        ok = response.status_code == 200 and count <= limit
+        failed = failed or not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {count:3d}/{limit:<3d} {response.status_code} {url}")
+        if not ok:
+            for statement in statements:
+                print('        ', ' '.join(statement.split())[:150])
+
+    os.remove(db_path)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
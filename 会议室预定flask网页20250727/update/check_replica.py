@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import date, time, timedelta
+#### 此文件 用两个 SQLite 文件模拟主库和只读副本，检查读写分离是否生效
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_replica.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db
+# 副本只在调用 sync_replica() 时从主库复制，以此模拟复制延迟；任一检查失败时以非零状态退出
+
+tmp_dir = tempfile.mkdtemp()
+primary_path = os.path.join(tmp_dir, 'primary.db')
+replica_path = os.path.join(tmp_dir, 'replica.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + primary_path
+os.environ['DATABASE_REPLICA_URL'] = 'sqlite:///' + replica_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, db, Room, Reservation
+
+failed = False
+
+
+def sync_replica():
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    source.backup(target)
+    target.close()
+    source.close()
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def page_text(client, url):
+    return client.get(url).get_data(as_text=True)
+
+
+def main():
+    sync_replica()
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    # 写入只到达主库
+    tomorrow = date.today() + timedelta(days=1)
+    with app.app_context():
+        room = Room(name='仅主库会议室', location='1楼', capacity=10)
+        db.session.add(room)
+        db.session.flush()
+        db.session.add(Reservation(title='仅主库预订', date=tomorrow, start_time=time(9, 0), end_time=time(10, 0),
+                                   attendees=1, user_id=1, room_id=room.id))
+        db.session.commit()
+        room_id = room.id
+
+    check('只读页面 / 从副本查询即将到来的预订，看不到尚未复制的预订', '仅主库预订' not in page_text(client, '/'))
+    check('其他页面 /my_reservations 从主库读取', '仅主库预订' in page_text(client, '/my_reservations'))
+
+    # 只读接口中写入缓存的数据仍从主库读取
+    check('基础数据缓存从主库加载',
+          '仅主库会议室' in {room['name'] for room in client.get('/api/rooms').get_json()})
+    day = date.today() + timedelta(days=2)
+    with app.app_context():
+        db.session.add(Reservation(title='主库预订', date=day, start_time=time(9, 0), end_time=time(10, 0),
+                                   attendees=1, user_id=1, room_id=room_id))
+        db.session.commit()
+    events = client.get(f'/calendar_data?start={day}&end={day + timedelta(days=1)}').get_json()
+    check('日历缓存从主库加载', any(event['title'].endswith('主库预订') for event in events))
+
+    sync_replica()
+    check('复制后副本可以看到新预订', '仅主库预订' in page_text(client, '/'))
+
+    for path in (primary_path, replica_path):
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
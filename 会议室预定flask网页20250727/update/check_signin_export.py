@@ -0,0 +1,97 @@
+import io
+import os
+import sys
+import tempfile
+import zipfile
+from datetime import date, time, timedelta
+#### 此文件 检查批量下载签到表：按日期范围和会议室筛选、流式输出的 ZIP 中每份签到表与单独下载的一致
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_signin_export.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db；任一检查失败时以非零状态退出
+
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'signin_export.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from main import app, db, Reservation, User, Role
+
+DAYS = 3
+PER_DAY = 4
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def main():
+    first_day = date.today() + timedelta(days=1)
+    with app.app_context():
+        for offset in range(DAYS):
+            for i in range(PER_DAY):
+                db.session.add(Reservation(
+                    title=f'例会/{offset}-{i}', date=first_day + timedelta(days=offset),
+                    start_time=time(9 + i, 0), end_time=time(10 + i, 0), attendees=2, user_id=1,
+                    room_id=1 + i % 2, attendee_names='张三\n李四'
+                ))
+        db.session.add(Reservation(title='已取消', date=first_day, start_time=time(15, 0), end_time=time(16, 0),
+                                   attendees=1, user_id=1, room_id=1, status='canceled'))
+        user = User(username='staff', email='staff@example.com', role_id=Role.query.filter_by(name='user').first().id)
+        user.set_password('staff')
+        db.session.add(user)
+        db.session.commit()
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    last_day = first_day + timedelta(days=DAYS - 1)
+
+    response = client.get(f'/admin/signin-sheets?date_from={first_day}&date_to={last_day}', buffered=False)
+    check('响应为流式 ZIP', response.is_streamed and response.mimetype == 'application/zip')
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(response.response)))
+    names = archive.namelist()
+    check('包含范围内全部已确认预订，不含已取消的', len(names) == DAYS * PER_DAY and not any('已取消' in name for name in names))
+    check('按日期分目录，标题中的 / 被替换', names[0].startswith(first_day.strftime('%Y%m%d') + '/0900_') and '例会_0-0' in names[0])
+    doc = Document(io.BytesIO(archive.read(names[0])))
+    check('签到表内容与单独下载相同的版式', doc.paragraphs[0].text == '会议签到表' and doc.tables[0].cell(1, 2).text == '张三')
+
+    single = client.get('/reservation/1/signin-sheet').data
+    check('与单独下载的签到表完全相同', archive.read(names[0]) == single)
+
+    response = client.get(f'/admin/signin-sheets?date_from={first_day}&date_to={first_day}&room_id=2')
+    names = zipfile.ZipFile(io.BytesIO(response.data)).namelist()
+    check('按会议室和日期筛选', len(names) == PER_DAY // 2)
+
+    response = client.get(f'/admin/signin-sheets?date_from={last_day + timedelta(days=30)}')
+    check('没有预订时返回预订管理页', response.status_code == 302 and '/admin/reservations' in response.headers['Location'])
+
+    staff = app.test_client()
+    staff.post('/login', data={'username': 'staff', 'password': 'staff'})
+    check('普通用户无权批量下载', staff.get('/admin/signin-sheets').status_code == 302)
+
+    # 快速预订接口和预订详情页也能填写参会人员
+    booking = {'room_id': 1, 'date': str(first_day), 'start_time': '17:00', 'end_time': '18:00', 'title': '快速预订'}
+    response = staff.post('/api/quick_reserve', json=dict(booking, attendee_names=['王五', ' ', '赵六']))
+    reservation_id = response.get_json().get('reservation_id')
+    doc = Document(io.BytesIO(staff.get(f'/reservation/{reservation_id}/signin-sheet').data))
+    check('快速预订填写的参会人员进入签到表',
+          [doc.tables[0].cell(row, 2).text for row in (1, 2, 3)] == ['王五', '赵六', ''])
+    response = staff.post('/api/quick_reserve', json=dict(booking, start_time='18:00', end_time='19:00', attendee_names=5))
+    check('参会人员格式无效时返回 400', response.status_code == 400)
+    staff.post(f'/reservation/{reservation_id}/attendees', data={'attendee_names': '钱七\r\n孙八'})
+    doc = Document(io.BytesIO(staff.get(f'/reservation/{reservation_id}/signin-sheet').data))
+    check('修改参会人员后签到表随之更新', [doc.tables[0].cell(row, 2).text for row in (1, 2)] == ['钱七', '孙八'])
+    check('详情页显示修改后的参会人员', '钱七、孙八' in staff.get(f'/reservation/{reservation_id}').get_data(as_text=True))
+    response = client.post('/reservation/1/attendees', data={'attendee_names': ''})
+    check('管理员可以清空参会人员', response.status_code == 302 and '未填写' in client.get('/reservation/1').get_data(as_text=True))
+    response = staff.post('/reservation/2/attendees', data={'attendee_names': '冒名'})
+    with app.app_context():
+        check('不能修改他人预订的参会人员', db.session.get(Reservation, 2).attendee_names == '张三\n李四')
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
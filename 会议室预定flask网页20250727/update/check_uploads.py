@@ -0,0 +1,134 @@
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+from datetime import date, time, timedelta
+from io import BytesIO
+#### 此文件 检查会议文档上传：边接收边计算校验和、相同内容只存一份、最后一个引用删除后才删除文件
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/check_uploads.py
+# 使用临时数据库和临时上传目录，不会修改 instance/meeting_rooms.db 和 uploads；任一检查失败时以非零状态退出
+
+tmp_dir = tempfile.mkdtemp()
+db_path = os.path.join(tmp_dir, 'uploads.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 旧版本的文档表没有 checksum 列，启动时应自动补充
+conn = sqlite3.connect(db_path)
+conn.execute("""CREATE TABLE reservation_document (
+    id INTEGER PRIMARY KEY, filename VARCHAR(255) NOT NULL, stored_filename VARCHAR(255) NOT NULL,
+    file_type VARCHAR(50), file_size INTEGER, upload_time DATETIME,
+    reservation_id INTEGER NOT NULL, uploaded_by INTEGER NOT NULL)""")
+conn.close()
+
+from main import app, db, Reservation, ReservationDocument, HashingUpload, document_store
+
+upload_folder = os.path.join(tmp_dir, 'uploads')
+os.makedirs(os.path.join(upload_folder, 'tmp'))
+app.config['UPLOAD_FOLDER'] = upload_folder
+document_store.folder = upload_folder
+
+failed = False
+
+
+def check(name, ok):
+    global failed
+    failed = failed or not ok
+    print(f"{'OK  ' if ok else 'FAIL'} {name}")
+
+
+def stored_files():
+    return sorted(os.path.relpath(os.path.join(root, name), upload_folder)
+                  for root, _, names in os.walk(upload_folder) for name in names)
+
+
+def external_count(sql):
+    connection = sqlite3.connect(db_path)
+    count = connection.execute(sql).fetchone()[0]
+    connection.close()
+    return count
+
+
+def upload(client, reservation_id, content, filename):
+    return client.post(f'/reservation/{reservation_id}/upload',
+                       data={'document': (BytesIO(content), filename)}, content_type='multipart/form-data')
+
+
+def main_check():
+    with app.app_context():
+        columns = {column['name'] for column in db.inspect(db.engine).get_columns('reservation_document')}
+        check('旧数据库自动添加 checksum 列', 'checksum' in columns)
+        day = date.today() + timedelta(days=3)
+        reservations = [Reservation(title=f'会议{i}', date=day, start_time=time(9 + i, 0), end_time=time(10 + i, 0),
+                                    attendees=1, user_id=1, room_id=1) for i in range(3)]
+        db.session.add_all(reservations)
+        db.session.commit()
+        ids = [reservation.id for reservation in reservations]
+
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+
+    # 接收请求时文件直接写入临时文件
+    with app.test_request_context('/', method='POST', data={'document': (BytesIO(b'x' * 1000), 'a.txt')}):
+        from flask import request
+        check('上传内容写入 HashingUpload 而不是内存', isinstance(request.files['document'].stream, HashingUpload))
+
+    slides = os.urandom(12 * 1024 * 1024)  # 超过原来 10MB 的上限
+    checksum = hashlib.sha256(slides).hexdigest()
+    upload(client, ids[0], slides, '季度汇报.pptx')
+    upload(client, ids[1], slides, 'report.pptx')
+    upload(client, ids[2], b'agenda', 'agenda.txt')
+    with app.app_context():
+        documents = ReservationDocument.query.order_by(ReservationDocument.id).all()
+        check('三份文档都已保存', len(documents) == 3)
+        check('相同内容的文档共用一个文件', documents[0].stored_filename == documents[1].stored_filename == f'{checksum[:2]}/{checksum}')
+        check('记录校验和与大小', documents[0].checksum == checksum and documents[0].file_size == len(slides))
+        document_ids = [document.id for document in documents]
+    check('磁盘上只有两个文件，没有残留的临时文件', len(stored_files()) == 2)
+
+    response = client.get(f'/document/{document_ids[1]}/download')
+    check('下载内容与上传一致', response.data == slides)
+    check('下载文件名为各自的原始文件名', 'report.pptx' in response.headers.get('Content-Disposition', ''))
+
+    client.post(f'/document/{document_ids[0]}/delete')
+    check('仍有引用时保留文件', len(stored_files()) == 2)
+    client.post(f'/document/{document_ids[1]}/delete')
+    check('最后一个引用删除后删除文件', len(stored_files()) == 1 and checksum not in stored_files()[0])
+
+    # 随预订级联删除的文档同样释放文件
+    with app.app_context():
+        db.session.delete(db.session.get(Reservation, ids[2]))
+        db.session.commit()
+    check('删除预订后其文档文件被删除', stored_files() == [])
+    check('文件删除后其文件行也被删除', external_count('SELECT COUNT(*) FROM document_file') == 0)
+
+    # 另一个进程正在引用同一文件（已锁定文件行、记录尚未提交）时，删除最后一个引用不会删掉文件
+    upload(client, ids[0], b'minutes', 'minutes.txt')
+    with app.app_context():
+        document = ReservationDocument.query.filter_by(filename='minutes.txt').one()
+        document_id, stored_filename = document.id, document.stored_filename
+    other = sqlite3.connect(db_path)
+    other.execute('UPDATE document_file SET stored_filename = stored_filename WHERE stored_filename = ?', (stored_filename,))
+    other.execute("INSERT INTO reservation_document (filename, stored_filename, reservation_id, uploaded_by) "
+                  "VALUES ('minutes-copy.txt', ?, ?, 1)", (stored_filename, ids[1]))
+    deleting = threading.Thread(target=client.post, args=(f'/document/{document_id}/delete',))
+    deleting.start()
+    deleting.join(0.5)
+    check('删除在另一个进程的事务结束前等待', deleting.is_alive())
+    other.commit()
+    other.close()
+    deleting.join()
+    check('另一个进程提交引用后文件仍保留', stored_files() == [stored_filename.replace('/', os.sep)])
+
+    # 没有保存的上传（例如格式不允许）不会留下临时文件
+    upload(client, ids[0], b'binary', 'tool.exe')
+    check('被拒绝的上传不留临时文件', len(stored_files()) == 1)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main_check()
@@ -0,0 +1,101 @@
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+#### 此文件 多线程并发预订同一会议室，检查不会出现时间重叠的重复预订
+### (meet1) D:\JupyterRoot\A\华为\会议室预定flask网页20250727>
+#  python update/stress_booking.py
+# 使用临时数据库，不会修改 instance/meeting_rooms.db
+# 出现重叠预订、任何 5xx 响应或总耗时超过 TIME_BUDGET 秒（例如连接池耗尽后互相等待）时以非零状态退出
+
+db_path = os.path.join(tempfile.mkdtemp(), 'stress_booking.db')
+os.environ['DATABASE_URL'] = 'sqlite:///' + db_path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app
+
+THREADS = 16
+ATTEMPTS = 40
+ROOM_ID = 1
+TIME_BUDGET = 60
+
+day = date.today() + timedelta(days=1)
+
+# 在同一会议室同一天内随机选择 30 分钟对齐、时长 30-90 分钟的时间段
+def random_slot():
+    start = random.randrange(8 * 60, 19 * 60, 30)
+    end = min(start + random.choice((30, 60, 90)), 20 * 60)
+    return f'{start // 60:02d}:{start % 60:02d}', f'{end // 60:02d}:{end % 60:02d}'
+
+
+def worker(index, counts, lock):
+    client = app.test_client()
+    client.post('/login', data={'username': 'admin', 'password': 'admin'})
+    for i in range(ATTEMPTS):
+        start_time, end_time = random_slot()
+        if i % 4 == 0:
+            # 夹杂批量接口：同一时间连续两天
+            response = client.post('/api/batch_reserve', json={
+                'title': f'压测批量{index}-{i}', 'room_id': ROOM_ID, 'date': day.isoformat(),
+                'start_time': start_time, 'end_time': end_time,
+                'recurrence': {'freq': 'daily', 'count': 2}, 'atomic': True
+            })
+        else:
+            response = client.post('/api/quick_reserve', json={
+                'title': f'压测{index}-{i}', 'room_id': ROOM_ID, 'date': day.isoformat(),
+                'start_time': start_time, 'end_time': end_time
+            })
+        with lock:
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+def find_overlaps():
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT a.id, b.id, a.date, a.start_time, a.end_time, b.start_time, b.end_time
+        FROM reservation a JOIN reservation b
+          ON a.room_id = b.room_id AND a.date = b.date AND a.id < b.id
+         AND a.start_time < b.end_time AND b.start_time < a.end_time
+        WHERE a.status = 'confirmed' AND b.status = 'confirmed'
+    """).fetchall()
+    total = conn.execute("SELECT count(*) FROM reservation WHERE status = 'confirmed'").fetchone()[0]
+    conn.close()
+    return rows, total
+
+
+def main():
+    random.seed(1)
+    counts = {}
+    lock = threading.Lock()
+    threads = [threading.Thread(target=worker, args=(i, counts, lock)) for i in range(THREADS)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    overlaps, total = find_overlaps()
+    print(f"{THREADS} 个线程 x {ATTEMPTS} 次请求，耗时 {elapsed:.2f}s")
+    print("响应状态:", dict(sorted(counts.items())))
+    print(f"已确认预订 {total} 条，重叠 {len(overlaps)} 对")
+    for row in overlaps[:10]:
+        print('    ', row)
+
+    errors = sum(count for status, count in counts.items() if status >= 500)
+    if errors:
+        print(f"出现 {errors} 个 5xx 响应")
+    if elapsed > TIME_BUDGET:
+        print(f"耗时超过 {TIME_BUDGET}s")
+
+    os.remove(db_path)
+    sys.exit(1 if overlaps or errors or elapsed > TIME_BUDGET else 0)
+
+
+if __name__ == '__main__':
+    main()